@@ -5,226 +5,301 @@ Handles CSV and PDF export of violation data
 import csv
 import io
 import base64
-from typing import List, Dict
+from collections import Counter
+from typing import List, Dict, Iterable, Iterator, AsyncIterable, AsyncIterator
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Static HTML fragments shared by every report; kept as plain strings so they
+# are built once at import time instead of re-formatted on each request.
+_REPORT_HEAD_HTML = """
+            <!DOCTYPE html>
+            <html>
+            <head>
+                <meta charset="UTF-8">
+                <title>Exam Proctoring Report</title>
+                <style>
+                    body { font-family: Arial, sans-serif; margin: 40px; }
+                    h1 { color: #333; border-bottom: 2px solid #333; padding-bottom: 10px; }
+                    h2 { color: #666; margin-top: 30px; }
+                    table { border-collapse: collapse; width: 100%; margin: 20px 0; }
+                    th, td { border: 1px solid #ddd; padding: 12px; text-align: left; }
+                    th { background-color: #4CAF50; color: white; }
+                    tr:nth-child(even) { background-color: #f2f2f2; }
+                    .stat-box { display: inline-block; margin: 10px; padding: 20px; border: 2px solid #4CAF50; border-radius: 5px; min-width: 150px; }
+                    .stat-number { font-size: 36px; font-weight: bold; color: #4CAF50; }
+                    .stat-label { color: #666; font-size: 14px; }
+                </style>
+            </head>
+"""
+
+_SUMMARY_TABLE_HEAD = """
+                <h2>Violation Breakdown</h2>
+                <table>
+                    <tr>
+                        <th>Violation Type</th>
+                        <th>Count</th>
+                    </tr>
+"""
+
+_STUDENT_TABLE_HEAD = """
+                </table>
+                
+                <h2>Student-wise Summary</h2>
+                <table>
+                    <tr>
+                        <th>Student ID</th>
+                        <th>Student Name</th>
+                        <th>Total Violations</th>
+                    </tr>
+"""
+
+_REPORT_TAIL_HTML = """
+                </table>
+            </body>
+            </html>
+"""
+
+_STUDENT_REPORT_HEAD_HTML = '<!DOCTYPE html><html><head><meta charset="UTF-8">'
+
+_STUDENT_REPORT_STYLE = '<style>body{font-family:Arial,sans-serif;margin:40px;background:#f9f9f9}.header{text-align:center;border-bottom:3px solid #e74c3c;padding-bottom:20px;margin-bottom:30px;background:white;padding:30px;border-radius:10px}h1{color:#e74c3c;margin:0}h2{color:#333;border-bottom:2px solid #e74c3c;padding-bottom:10px;margin-top:30px}table{border-collapse:collapse;width:100%;margin:20px 0;background:white}th,td{border:1px solid #ddd;padding:12px;text-align:left}th{background-color:#e74c3c;color:white}tr:nth-child(even){background:#f9f9f9}.violation-card{border:1px solid #ddd;padding:20px;margin:15px 0;border-radius:5px;background:white}.violation-card:nth-child(even){background:#f9f9f9}.summary-box{background:white;padding:20px;border-radius:8px;margin:20px 0;box-shadow:0 2px 4px rgba(0,0,0,0.1)}.badge{display:inline-block;padding:4px 12px;border-radius:4px;font-size:12px;font-weight:bold}.badge-high{background:#e74c3c;color:white}.badge-medium{background:#f39c12;color:white}.badge-low{background:#3498db;color:white}</style></head><body>'
+
+# Single-pass translate table used instead of html.escape for per-field escaping
+_HTML_ESCAPE_TABLE = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#x27;'
+})
+
+# Streamed reports yield violation cards in batches rather than one chunk per card
+_HTML_CARDS_PER_CHUNK = 100
+
+_STUDENT_BREAKDOWN_TABLE_HEAD = '<h2>Violation Breakdown</h2><table><tr><th>Violation Type</th><th>Count</th><th>Percentage</th></tr>'
+
+VIOLATION_CSV_HEADERS = (
+    'Violation ID', 'Student ID', 'Student Name', 'Session ID',
+    'Violation Type', 'Severity', 'Message', 'Timestamp',
+    'Snapshot URL'
+)
+
+# Document fields read by the violations CSV, usable as a DB projection
+VIOLATION_CSV_FIELDS = (
+    'id', 'student_id', 'student_name', 'session_id',
+    'violation_type', 'severity', 'message', 'timestamp',
+    'snapshot_url'
+)
+
+
+class _Echo:
+    """Pseudo file whose write() returns the value, so csv.writer hands back each formatted row"""
+    
+    def write(self, value: str) -> str:
+        return value
+
+
+class _ListSink:
+    """Pseudo file that collects written chunks in a list for a single final join"""
+    
+    __slots__ = ('write',)
+    
+    def __init__(self, chunks: List[str]):
+        self.write = chunks.append
+
+
+# csv.writer over _Echo keeps no state between rows, so one writer formats every export
+_CSV_LINE_WRITER = csv.writer(_Echo())
+_VIOLATION_CSV_HEADER_LINE = _CSV_LINE_WRITER.writerow(VIOLATION_CSV_HEADERS)
+
+
+def _violation_csv_line(v: Dict) -> str:
+    """Format one violation as a CSV line"""
+    return _CSV_LINE_WRITER.writerow((
+        v.get('id', ''),
+        v.get('student_id', ''),
+        v.get('student_name', ''),
+        v.get('session_id', ''),
+        v.get('violation_type', ''),
+        v.get('severity', ''),
+        v.get('message', ''),
+        v.get('timestamp', ''),
+        v.get('snapshot_url', '')
+    ))
+
+
+def _pretty_type(violation_type: str) -> str:
+    return violation_type.replace('_', ' ').title()
+
+
+def _esc(value) -> str:
+    """HTML-escape a value for element text or a double-quoted attribute"""
+    return str(value).translate(_HTML_ESCAPE_TABLE)
+
+
 class ExportService:
     
     @staticmethod
     def export_violations_csv(violations: List[Dict]) -> str:
         """Export violations to CSV format"""
+        if not violations:
+            return ""
+        return ''.join(ExportService.iter_violations_csv(violations))
+    
+    @staticmethod
+    def iter_violations_csv(violations: Iterable[Dict]) -> Iterator[str]:
+        """Yield violations CSV row by row so large exports can be streamed"""
         try:
-            output = io.StringIO()
-            
-            if not violations:
-                return ""
-            
-            # Define CSV headers
-            headers = [
-                'Violation ID', 'Student ID', 'Student Name', 'Session ID',
-                'Violation Type', 'Severity', 'Message', 'Timestamp',
-                'Snapshot URL'
-            ]
-            
-            writer = csv.DictWriter(output, fieldnames=headers)
-            writer.writeheader()
-            
+            yield _VIOLATION_CSV_HEADER_LINE
             for v in violations:
-                writer.writerow({
-                    'Violation ID': v.get('id', ''),
-                    'Student ID': v.get('student_id', ''),
-                    'Student Name': v.get('student_name', ''),
-                    'Session ID': v.get('session_id', ''),
-                    'Violation Type': v.get('violation_type', ''),
-                    'Severity': v.get('severity', ''),
-                    'Message': v.get('message', ''),
-                    'Timestamp': v.get('timestamp', ''),
-                    'Snapshot URL': v.get('snapshot_url', '')
-                })
-            
-            return output.getvalue()
+                yield _violation_csv_line(v)
         except Exception as e:
+            # Re-raise so a streamed response is aborted instead of ending as a truncated CSV
             logger.error(f"CSV export error: {e}")
-            return ""
+            raise
     
     @staticmethod
-    def export_summary_csv(sessions: List[Dict], violations: List[Dict], students: List[Dict]) -> str:
-        """Export summary statistics to CSV"""
+    async def aiter_violations_csv(violations: AsyncIterable[Dict]) -> AsyncIterator[str]:
+        """Async variant of iter_violations_csv for streaming straight from a DB cursor"""
         try:
-            output = io.StringIO()
+            yield _VIOLATION_CSV_HEADER_LINE
+            async for v in violations:
+                yield _violation_csv_line(v)
+        except Exception as e:
+            logger.error(f"CSV export error: {e}")
+            raise
+    
+    @staticmethod
+    def export_summary_csv(
+        total_students: int,
+        total_sessions: int,
+        violation_types: Counter,
+        student_violations: Counter
+    ) -> str:
+        """
+        Export summary statistics to CSV
+        Takes pre-aggregated counts: violations per type and per (student_id, student_name)
+        """
+        try:
+            # Small, fixed-shape report: collect chunks and join once instead of growing a StringIO
+            parts: List[str] = []
+            writer = csv.writer(_ListSink(parts), lineterminator='\n')
             
             # Summary statistics
-            output.write("EXAM PROCTORING SUMMARY REPORT\n")
-            output.write(f"Generated: {datetime.utcnow().isoformat()}\n\n")
+            parts.append("EXAM PROCTORING SUMMARY REPORT\n")
+            parts.append(f"Generated: {datetime.utcnow().isoformat()}\n\n")
             
-            output.write("OVERALL STATISTICS\n")
-            output.write(f"Total Students,{len(students)}\n")
-            output.write(f"Total Sessions,{len(sessions)}\n")
-            output.write(f"Total Violations,{len(violations)}\n\n")
+            parts.append("OVERALL STATISTICS\n")
+            writer.writerows((
+                ("Total Students", total_students),
+                ("Total Sessions", total_sessions),
+                ("Total Violations", sum(violation_types.values()))
+            ))
+            parts.append("\n")
             
             # Violation breakdown
-            output.write("VIOLATION BREAKDOWN\n")
-            violation_types = {}
-            for v in violations:
-                v_type = v.get('violation_type', 'unknown')
-                violation_types[v_type] = violation_types.get(v_type, 0) + 1
+            parts.append("VIOLATION BREAKDOWN\n")
+            parts.append("Violation Type,Count\n")
+            writer.writerows(sorted(violation_types.items()))
             
-            output.write("Violation Type,Count\n")
-            for v_type, count in sorted(violation_types.items()):
-                output.write(f"{v_type},{count}\n")
-            
-            output.write("\n")
+            parts.append("\n")
             
             # Student-wise summary
-            output.write("STUDENT-WISE SUMMARY\n")
-            output.write("Student ID,Student Name,Total Violations\n")
-            
-            student_violations = {}
-            for v in violations:
-                student_id = v.get('student_id', '')
-                student_name = v.get('student_name', '')
-                key = f"{student_id}|{student_name}"
-                student_violations[key] = student_violations.get(key, 0) + 1
+            parts.append("STUDENT-WISE SUMMARY\n")
+            parts.append("Student ID,Student Name,Total Violations\n")
             
-            for key, count in sorted(student_violations.items(), key=lambda x: x[1], reverse=True):
-                student_id, student_name = key.split('|')
-                output.write(f"{student_id},{student_name},{count}\n")
+            for (student_id, student_name), count in student_violations.most_common():
+                writer.writerow((student_id, student_name, count))
             
-            return output.getvalue()
+            return ''.join(parts)
         except Exception as e:
             logger.error(f"Summary CSV export error: {e}")
             return ""
     
     @staticmethod
-    def generate_html_report(sessions: List[Dict], violations: List[Dict], students: List[Dict]) -> str:
+    def generate_html_report(
+        total_students: int,
+        total_sessions: int,
+        violation_types: Counter,
+        student_violations: Counter
+    ) -> str:
         """Generate HTML report (can be converted to PDF)"""
+        return ''.join(ExportService.iter_html_report(
+            total_students, total_sessions, violation_types, student_violations
+        ))
+    
+    @staticmethod
+    def iter_html_report(
+        total_students: int,
+        total_sessions: int,
+        violation_types: Counter,
+        student_violations: Counter
+    ) -> Iterator[str]:
+        """
+        Yield the summary HTML report section by section for streaming
+        Takes the same pre-aggregated counts as export_summary_csv
+        """
         try:
-            # Violation breakdown
-            violation_types = {}
-            for v in violations:
-                v_type = v.get('violation_type', 'unknown')
-                violation_types[v_type] = violation_types.get(v_type, 0) + 1
+            now_str = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
             
-            # Student-wise summary
-            student_violations = {}
-            for v in violations:
-                student_id = v.get('student_id', '')
-                student_name = v.get('student_name', '')
-                key = f"{student_id}|{student_name}"
-                student_violations[key] = student_violations.get(key, 0) + 1
-            
-            html = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <title>Exam Proctoring Report</title>
-                <style>
-                    body {{ font-family: Arial, sans-serif; margin: 40px; }}
-                    h1 {{ color: #333; border-bottom: 2px solid #333; padding-bottom: 10px; }}
-                    h2 {{ color: #666; margin-top: 30px; }}
-                    table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
-                    th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
-                    th {{ background-color: #4CAF50; color: white; }}
-                    tr:nth-child(even) {{ background-color: #f2f2f2; }}
-                    .stat-box {{ display: inline-block; margin: 10px; padding: 20px; border: 2px solid #4CAF50; border-radius: 5px; min-width: 150px; }}
-                    .stat-number {{ font-size: 36px; font-weight: bold; color: #4CAF50; }}
-                    .stat-label {{ color: #666; font-size: 14px; }}
-                </style>
-            </head>
+            yield _REPORT_HEAD_HTML + f"""
             <body>
                 <h1>Exam Proctoring Summary Report</h1>
-                <p><strong>Generated:</strong> {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}</p>
+                <p><strong>Generated:</strong> {now_str}</p>
                 
                 <h2>Overall Statistics</h2>
                 <div class="stat-box">
-                    <div class="stat-number">{len(students)}</div>
+                    <div class="stat-number">{total_students}</div>
                     <div class="stat-label">Total Students</div>
                 </div>
                 <div class="stat-box">
-                    <div class="stat-number">{len(sessions)}</div>
+                    <div class="stat-number">{total_sessions}</div>
                     <div class="stat-label">Total Sessions</div>
                 </div>
                 <div class="stat-box">
-                    <div class="stat-number">{len(violations)}</div>
+                    <div class="stat-number">{sum(violation_types.values())}</div>
                     <div class="stat-label">Total Violations</div>
                 </div>
-                
-                <h2>Violation Breakdown</h2>
-                <table>
-                    <tr>
-                        <th>Violation Type</th>
-                        <th>Count</th>
-                    </tr>
             """
             
-            for v_type, count in sorted(violation_types.items(), key=lambda x: x[1], reverse=True):
-                html += f"""
-                    <tr>
-                        <td>{v_type.replace('_', ' ').title()}</td>
-                        <td>{count}</td>
-                    </tr>
-                """
-            
-            html += """
-                </table>
-                
-                <h2>Student-wise Summary</h2>
-                <table>
-                    <tr>
-                        <th>Student ID</th>
-                        <th>Student Name</th>
-                        <th>Total Violations</th>
-                    </tr>
-            """
-            
-            for key, count in sorted(student_violations.items(), key=lambda x: x[1], reverse=True):
-                stud_id, stud_name = key.split('|')
-                html += f"""
-                    <tr>
-                        <td>{stud_id}</td>
-                        <td>{stud_name}</td>
-                        <td>{count}</td>
-                    </tr>
-                """
+            yield _SUMMARY_TABLE_HEAD + "".join(
+                f"<tr><td>{_esc(_pretty_type(v_type))}</td><td>{count}</td></tr>"
+                for v_type, count in violation_types.most_common()
+            )
             
-            html += """
-                </table>
-            </body>
-            </html>
-            """
+            yield _STUDENT_TABLE_HEAD + "".join(
+                f"<tr><td>{_esc(stud_id)}</td><td>{_esc(stud_name)}</td><td>{count}</td></tr>"
+                for (stud_id, stud_name), count in student_violations.most_common()
+            )
             
-            return html
+            yield _REPORT_TAIL_HTML
         except Exception as e:
+            # Re-raise so a streamed report is aborted instead of silently truncated
             logger.error(f"HTML report generation error: {e}")
-            return ""
+            raise
 
     @staticmethod
     def export_student_violations_csv(student_id: str, student_name: str, violations: List[Dict]) -> str:
         """Export individual student violations to CSV"""
         try:
             output = io.StringIO()
+            writer = csv.writer(output, lineterminator='\n')
             
             # Header
-            output.write(f"STUDENT VIOLATION REPORT\n")
-            output.write(f"Student ID: {student_id}\n")
-            output.write(f"Student Name: {student_name}\n")
+            output.write("STUDENT VIOLATION REPORT\n")
+            writer.writerow((f"Student ID: {student_id}",))
+            writer.writerow((f"Student Name: {student_name}",))
             output.write(f"Generated: {datetime.utcnow().isoformat()}\n")
             output.write(f"Total Violations: {len(violations)}\n\n")
             
             # Violation breakdown
-            violation_types = {}
-            for v in violations:
-                v_type = v.get('violation_type', 'unknown')
-                violation_types[v_type] = violation_types.get(v_type, 0) + 1
+            violation_types = Counter(v.get('violation_type', 'unknown') for v in violations)
             
             output.write("VIOLATION BREAKDOWN\n")
             output.write("Violation Type,Count\n")
-            for v_type, count in sorted(violation_types.items()):
-                output.write(f"{v_type},{count}\n")
+            writer.writerows(sorted(violation_types.items()))
             
             output.write("\n")
             
@@ -232,8 +307,10 @@ class ExportService:
             output.write("DETAILED VIOLATIONS\n")
             output.write("Timestamp,Violation Type,Severity,Message\n")
             
-            for v in violations:
-                output.write(f"{v.get('timestamp', '')},{v.get('violation_type', '')},{v.get('severity', '')},{v.get('message', '')}\n")
+            writer.writerows(
+                (v.get('timestamp', ''), v.get('violation_type', ''), v.get('severity', ''), v.get('message', ''))
+                for v in violations
+            )
             
             return output.getvalue()
         except Exception as e:
@@ -243,60 +320,74 @@ class ExportService:
     @staticmethod
     def generate_student_html_report(student_id: str, student_name: str, violations: List[Dict]) -> str:
         """Generate HTML report for individual student with violation images"""
+        return ''.join(ExportService.iter_student_html_report(student_id, student_name, violations))
+    
+    @staticmethod
+    def iter_student_html_report(student_id: str, student_name: str, violations: List[Dict]) -> Iterator[str]:
+        """Yield the student HTML report section by section for streaming"""
         try:
-            # Simple HTML generation without complex string formatting
-            html_parts = []
-            
             # Violation breakdown
-            violation_types = {}
+            violation_types = Counter()
             for v in violations:
-                v_type = v.get('violation_type', 'unknown')
-                violation_types[v_type] = violation_types.get(v_type, 0) + 1
-            
-            # Header and styles
-            html_parts.append('<!DOCTYPE html><html><head><meta charset="UTF-8">')
-            html_parts.append(f'<title>Student Violation Report - {student_name}</title>')
-            html_parts.append('<style>body{font-family:Arial,sans-serif;margin:40px;background:#f9f9f9}.header{text-align:center;border-bottom:3px solid #e74c3c;padding-bottom:20px;margin-bottom:30px;background:white;padding:30px;border-radius:10px}h1{color:#e74c3c;margin:0}h2{color:#333;border-bottom:2px solid #e74c3c;padding-bottom:10px;margin-top:30px}table{border-collapse:collapse;width:100%;margin:20px 0;background:white}th,td{border:1px solid #ddd;padding:12px;text-align:left}th{background-color:#e74c3c;color:white}tr:nth-child(even){background:#f9f9f9}.violation-card{border:1px solid #ddd;padding:20px;margin:15px 0;border-radius:5px;background:white}.violation-card:nth-child(even){background:#f9f9f9}.summary-box{background:white;padding:20px;border-radius:8px;margin:20px 0;box-shadow:0 2px 4px rgba(0,0,0,0.1)}.badge{display:inline-block;padding:4px 12px;border-radius:4px;font-size:12px;font-weight:bold}.badge-high{background:#e74c3c;color:white}.badge-medium{background:#f39c12;color:white}.badge-low{background:#3498db;color:white}</style>')
-            html_parts.append('</head><body>')
-            html_parts.append(f'<div class="header"><h1>Student Violation Report</h1><p><strong>Student ID:</strong> {student_id}</p><p><strong>Student Name:</strong> {student_name}</p><p><strong>Generated:</strong> {datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")}</p></div>')
-            
-            # Statistics
-            html_parts.append(f'<div class="summary-box"><h2>Summary</h2>')
-            html_parts.append(f'<p><strong>Total Violations:</strong> {len(violations)}</p>')
-            html_parts.append(f'<p><strong>Report Generated:</strong> {datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")}</p>')
-            html_parts.append('</div>')
+                violation_types[v.get('violation_type', 'unknown')] += 1
+            
+            pretty_types = {t: _esc(_pretty_type(t)) for t in violation_types}
+            student_id = _esc(student_id)
+            student_name = _esc(student_name)
+            now_str = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+            total = len(violations)
+            inv_total = 100.0 / total if total else 0.0
+            
+            # Header, styles and statistics
+            yield (
+                f'{_STUDENT_REPORT_HEAD_HTML}<title>Student Violation Report - {student_name}</title>{_STUDENT_REPORT_STYLE}'
+                f'<div class="header"><h1>Student Violation Report</h1><p><strong>Student ID:</strong> {student_id}</p><p><strong>Student Name:</strong> {student_name}</p><p><strong>Generated:</strong> {now_str}</p></div>'
+                f'<div class="summary-box"><h2>Summary</h2>'
+                f'<p><strong>Total Violations:</strong> {total}</p>'
+                f'<p><strong>Report Generated:</strong> {now_str}</p>'
+                '</div>'
+            )
             
             # Violation breakdown table
-            html_parts.append('<h2>Violation Breakdown</h2><table><tr><th>Violation Type</th><th>Count</th><th>Percentage</th></tr>')
-            for v_type, count in sorted(violation_types.items(), key=lambda x: x[1], reverse=True):
-                percentage = (count / len(violations)) * 100 if len(violations) > 0 else 0
-                html_parts.append(f'<tr><td>{v_type.replace("_", " ").title()}</td><td>{count}</td><td>{percentage:.1f}%</td></tr>')
-            html_parts.append('</table>')
+            yield _STUDENT_BREAKDOWN_TABLE_HEAD + ''.join(
+                f'<tr><td>{pretty_types[v_type]}</td><td>{count}</td><td>{count * inv_total:.1f}%</td></tr>'
+                for v_type, count in violation_types.most_common()
+            ) + '</table>'
             
-            # Detailed violations
-            html_parts.append('<h2>Detailed Violations</h2>')
+            # Detailed violations, flushed in batches of cards
+            cards = ['<h2>Detailed Violations</h2>']
             
             for i, v in enumerate(violations, 1):
-                violation_type = v.get('violation_type', 'unknown')
-                severity = v.get("severity", "N/A").upper()
-                timestamp_str = str(v.get('timestamp', 'N/A'))
+                vtype_pretty = pretty_types[v.get('violation_type', 'unknown')]
+                severity = _esc(v.get("severity", "N/A").upper())
+                message = _esc(v.get("message", "N/A"))
+                timestamp = v.get('timestamp', 'N/A')
+                if isinstance(timestamp, datetime):
+                    timestamp_str = timestamp.isoformat(sep=' ', timespec='seconds')
+                else:
+                    timestamp_str = _esc(timestamp)
                 
                 # Color-coded severity badge
                 badge_class = 'badge-high' if severity == 'HIGH' else 'badge-medium' if severity == 'MEDIUM' else 'badge-low'
                 
-                html_parts.append(f'<div class="violation-card">')
-                html_parts.append(f'<h3>Violation #{i}: {violation_type.replace("_", " ").title()}</h3>')
-                html_parts.append(f'<p><strong>Severity:</strong> <span class="badge {badge_class}">{severity}</span></p>')
-                html_parts.append(f'<p><strong>Message:</strong> {v.get("message", "N/A")}</p>')
-                html_parts.append(f'<p><strong>Timestamp:</strong> {timestamp_str}</p>')
-                html_parts.append('</div>')
-            
-            html_parts.append('</body></html>')
-            
-            return ''.join(html_parts)
+                cards.append(
+                    f'<div class="violation-card">'
+                    f'<h3>Violation #{i}: {vtype_pretty}</h3>'
+                    f'<p><strong>Severity:</strong> <span class="badge {badge_class}">{severity}</span></p>'
+                    f'<p><strong>Message:</strong> {message}</p>'
+                    f'<p><strong>Timestamp:</strong> {timestamp_str}</p>'
+                    '</div>'
+                )
+                if len(cards) >= _HTML_CARDS_PER_CHUNK:
+                    yield ''.join(cards)
+                    cards.clear()
+            
+            cards.append('</body></html>')
+            yield ''.join(cards)
         except Exception as e:
+            # Re-raise so a streamed report is aborted instead of silently truncated
             logger.error(f"Student HTML report generation error: {e}")
-            return ""
+            raise
 
 # Global instance
 export_service = ExportService()
@@ -22,6 +22,10 @@ class StudentResponse(BaseModel):
     email: str
     registered_at: datetime
 
+class StudentBatchResponse(BaseModel):
+    registered: List[StudentResponse]
+    duplicate_emails: List[str]
+
 # Exam Session Models
 class ExamSession(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -66,6 +70,7 @@ class Violation(BaseModel):
     snapshot_base64: Optional[str] = None  # Temporary base64 before upload
     head_pose: Optional[Dict] = None
     audio_level: Optional[float] = None  # Audio level for noise violations
+    occurrences: int = 1  # Frames folded into this record by the debounce window
 
 class ViolationCreate(BaseModel):
     session_id: str
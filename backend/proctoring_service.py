@@ -38,6 +38,13 @@ class ProctoringService:
             (150.0, -150.0, -125.0)
         ], dtype=np.float64)
         
+        # Face mesh landmarks matching model_points (nose tip, chin, eye corners, mouth corners)
+        self.pose_landmark_ids = (1, 152, 33, 263, 61, 291)
+        
+        # solvePnP inputs that only depend on the frame size are built once
+        self.dist_coeffs = np.zeros((4, 1))
+        self._camera_matrices: Dict[Tuple[int, int], np.ndarray] = {}
+        
         # Thresholds (increased by 35% for leniency)
         self.MAX_YAW_OFFSET = 110 * 1.35
         self.MAX_PITCH_OFFSET = 140 * 1.35
@@ -51,27 +58,26 @@ class ProctoringService:
         Estimate head pose (pitch, yaw, roll) from facial landmarks
         """
         try:
-            image_points = np.array([
-                (landmarks[1].x * width, landmarks[1].y * height),
-                (landmarks[152].x * width, landmarks[152].y * height),
-                (landmarks[33].x * width, landmarks[33].y * height),
-                (landmarks[263].x * width, landmarks[263].y * height),
-                (landmarks[61].x * width, landmarks[61].y * height),
-                (landmarks[291].x * width, landmarks[291].y * height)
-            ], dtype=np.float64)
+            image_points = np.array(
+                [(landmarks[i].x, landmarks[i].y) for i in self.pose_landmark_ids],
+                dtype=np.float64
+            ) * (width, height)
 
-            focal_length = width
-            camera_matrix = np.array([
-                [focal_length, 0, width / 2],
-                [0, focal_length, height / 2],
-                [0, 0, 1]
-            ], dtype=np.float64)
+            camera_matrix = self._camera_matrices.get((width, height))
+            if camera_matrix is None:
+                focal_length = width
+                camera_matrix = np.array([
+                    [focal_length, 0, width / 2],
+                    [0, focal_length, height / 2],
+                    [0, 0, 1]
+                ], dtype=np.float64)
+                self._camera_matrices[(width, height)] = camera_matrix
 
             success, rotation_vector, _ = cv2.solvePnP(
                 self.model_points, 
                 image_points, 
                 camera_matrix, 
-                np.zeros((4, 1))
+                self.dist_coeffs
             )
             
             if not success:
@@ -167,13 +173,24 @@ class ProctoringService:
 
     def process_frame(self, frame_base64: str, calibrated_pitch: float, calibrated_yaw: float) -> Dict:
         """
-        Process a single frame for all violations
+        Process a single base64-encoded frame for all violations
         Returns comprehensive violation report
         """
         try:
             # Decode base64 frame
             frame_data = base64.b64decode(frame_base64.split(',')[1] if ',' in frame_base64 else frame_base64)
-            nparr = np.frombuffer(frame_data, np.uint8)
+        except Exception as e:
+            return {'error': f'Frame processing error: {str(e)}'}
+        
+        return self.process_frame_bytes(frame_data, calibrated_pitch, calibrated_yaw)
+
+    def process_frame_bytes(self, frame_bytes: bytes, calibrated_pitch: float, calibrated_yaw: float) -> Dict:
+        """
+        Process a single encoded image (JPEG/PNG bytes) for all violations
+        Skips the base64 layer entirely for clients that upload raw frames
+        """
+        try:
+            nparr = np.frombuffer(frame_bytes, np.uint8)
             frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
             
             if frame is None:
@@ -277,6 +294,20 @@ class ProctoringService:
         except Exception as e:
             return {'error': f'Frame processing error: {str(e)}'}
 
+    def warm_up(self):
+        """
+        Run a blank frame through every model once so the first real frame
+        doesn't pay for MediaPipe graph start-up and the first YOLO forward pass
+        """
+        blank = np.zeros((480, 640, 3), dtype=np.uint8)
+        _, encoded = cv2.imencode('.jpg', blank)
+        result = self.process_frame_bytes(encoded.tobytes(), 0.0, 0.0)
+        # process_frame_bytes reports failures in its result rather than raising
+        if 'error' in result:
+            raise RuntimeError(result['error'])
+        # The face mesh only runs for single-face frames, so start it directly
+        self.mp_face_mesh.process(cv2.cvtColor(blank, cv2.COLOR_BGR2RGB))
+
     def calibrate_from_frame(self, frame_base64: str) -> Optional[Tuple[float, float]]:
         """
         Extract calibration values (pitch, yaw) from a frame
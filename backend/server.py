@@ -1,18 +1,27 @@
-from fastapi import FastAPI, APIRouter, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, APIRouter, WebSocket, WebSocketDisconnect, HTTPException, UploadFile, File, Form, Request, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
 import logging
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Dict, Optional, Tuple, AsyncIterator
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import random
-import string
+import secrets
+import uuid
+import hashlib
+import time
+import orjson
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import DuplicateKeyError, BulkWriteError, OperationFailure
 
 # Import our custom modules
 from models import (
-    Student, StudentCreate, StudentResponse,
+    Student, StudentCreate, StudentResponse, StudentBatchResponse,
     ExamSession, ExamSessionCreate, ExamSessionUpdate,
     Violation, ViolationCreate,
     FrameProcessRequest, FrameProcessResponse,
@@ -23,9 +32,9 @@ from models import (
 )
 from proctoring_service import proctoring_service
 from supabase_service import supabase_service
-from websocket_manager import ws_manager
-from export_service import export_service
-from fastapi.responses import StreamingResponse, HTMLResponse
+from websocket_manager import ws_manager, encode_message
+from export_service import export_service, VIOLATION_CSV_FIELDS
+from fastapi.responses import StreamingResponse, HTMLResponse, ORJSONResponse
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -36,7 +45,8 @@ client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
 # Create the main app
-app = FastAPI(title="ExamEye Shield API")
+# orjson renders every JSON response (numpy values included) far faster than stdlib json
+app = FastAPI(title="ExamEye Shield API", default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -48,16 +58,209 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Frame decoding and model inference run here so they never block the event loop.
+# The MediaPipe graphs and YOLO model are shared and not thread-safe, hence one worker;
+# OpenCV and torch release the GIL while they run.
+frame_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="proctoring")
+
+# Violation types that come from the camera and get a snapshot uploaded
+CAMERA_BASED_VIOLATIONS = {'phone_detected', 'book_detected', 'multiple_faces', 'no_person', 'looking_away'}
+
+# student_id/student_name of active sessions, filled on start and dropped on end;
+# bounded LRU so sessions abandoned without ending don't accumulate
+SESSION_CACHE_SIZE = 1024
+_session_cache: "OrderedDict[str, Dict]" = OrderedDict()
+
+# List views skip Mongo's _id and the per-violation pose vectors they never display
+VIOLATION_LIST_PROJECTION = {"_id": 0, "head_pose": 0}
+
+# The student report renders no images, so snapshot payloads and pose vectors stay in MongoDB
+STUDENT_REPORT_PROJECTION = {"_id": 0, "snapshot_base64": 0, "head_pose": 0}
+
+# Streamed violation lists fill fields older documents lack (e.g. occurrences)
+VIOLATION_DEFAULTS = {
+    name: field.default for name, field in Violation.model_fields.items()
+    if not field.is_required() and field.default_factory is None
+}
+
+# Admin stats are memoized briefly so bursts of dashboard polls hit MongoDB once
+STATS_CACHE_TTL_SECONDS = 2.0
+_stats_cache: Dict = {'body': None, 'etag': None, 'expires': 0.0}
+
+# Browsers may reuse purely polled dashboard responses this long, then revalidate with the ETag
+POLL_CACHE_CONTROL = "private, max-age=2"
+# Lists the dashboard also refetches on WebSocket pushes must always revalidate;
+# unchanged lists still come back as cheap 304s
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+# Sustained conditions (looking away, no face) fire on every frame; within this window
+# repeats of a (session_id, violation_type) are folded into the last stored record
+VIOLATION_DEBOUNCE_SECONDS = float(os.environ.get('VIOLATION_DEBOUNCE_SECONDS', '3'))
+VIOLATION_FLUSH_INTERVAL_SECONDS = 5.0
+_recent_violations: Dict[Tuple[str, str], Tuple[str, float]] = {}
+_pending_repeats: Counter = Counter()
+# Ids of debounced records whose insert is still in flight; their repeats wait for it
+_unwritten_violations: set = set()
+_repeat_flush_task: Optional[asyncio.Task] = None
+
+# Retries when a freshly generated student_id hits the unique index
+STUDENT_ID_ATTEMPTS = 3
+
 
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
 def generate_student_id() -> str:
-    """Generate unique student ID (e.g., STU-ABC123)"""
-    letters = ''.join(random.choices(string.ascii_uppercase, k=3))
-    numbers = ''.join(random.choices(string.digits, k=3))
-    return f"STU-{letters}{numbers}"
+    """Generate unique student ID (e.g., STU-A1B2C3)"""
+    return f"STU-{secrets.token_hex(3).upper()}"
+
+
+def cache_session_identity(session_id: str, identity: Dict):
+    """Remember a session's identity, evicting the least recently used entry when full"""
+    _session_cache[session_id] = identity
+    _session_cache.move_to_end(session_id)
+    if len(_session_cache) > SESSION_CACHE_SIZE:
+        _session_cache.popitem(last=False)
+
+
+async def get_session_identity(session_id: str) -> Optional[Dict]:
+    """
+    Get student_id/student_name for a session, served from the in-process cache when possible
+    These never change during a session, so hot paths avoid a MongoDB read per frame
+    """
+    session = _session_cache.get(session_id)
+    if session is not None:
+        _session_cache.move_to_end(session_id)
+    if session is None:
+        doc = await db.exam_sessions.find_one(
+            {"id": session_id},
+            {"student_id": 1, "student_name": 1, "status": 1, "_id": 0}
+        )
+        if not doc:
+            return None
+        session = {"student_id": doc['student_id'], "student_name": doc['student_name']}
+        if doc.get('status') == 'active':
+            cache_session_identity(session_id, session)
+    return session
+
+
+async def aggregate_violation_counts() -> Tuple[Counter, Counter]:
+    """
+    Count violations per type and per (student_id, student_name) inside MongoDB
+    Only the grouped counts travel over the wire, not the violation documents
+    """
+    pipeline = [
+        {"$facet": {
+            "by_type": [
+                {"$group": {"_id": {"$ifNull": ["$violation_type", "unknown"]}, "count": {"$sum": 1}}},
+                {"$sort": {"_id": 1}}
+            ],
+            "by_student": [
+                {"$group": {
+                    "_id": {
+                        "student_id": {"$ifNull": ["$student_id", ""]},
+                        "student_name": {"$ifNull": ["$student_name", ""]}
+                    },
+                    "count": {"$sum": 1}
+                }},
+                {"$sort": {"_id.student_id": 1, "_id.student_name": 1}}
+            ]
+        }}
+    ]
+    result = await db.violations.aggregate(pipeline).to_list(1)
+    facets = result[0] if result else {"by_type": [], "by_student": []}
+    
+    violation_types = Counter({row["_id"]: row["count"] for row in facets["by_type"]})
+    student_violations = Counter({
+        (row["_id"]["student_id"], row["_id"]["student_name"]): row["count"]
+        for row in facets["by_student"]
+    })
+    return violation_types, student_violations
+
+
+async def flush_violation_repeats(violation_ids: Optional[List[str]] = None):
+    """
+    Add debounced repeat counts to the occurrences of the records they were folded into
+    Flushes every pending record, or only the given ones
+    """
+    candidates = _pending_repeats if violation_ids is None else violation_ids
+    pending = {
+        violation_id: _pending_repeats[violation_id] for violation_id in candidates
+        if _pending_repeats.get(violation_id) and violation_id not in _unwritten_violations
+    }
+    if not pending:
+        return
+    for violation_id in pending:
+        del _pending_repeats[violation_id]
+    await db.violations.bulk_write(
+        [UpdateOne({"id": violation_id}, {"$inc": {"occurrences": repeats}})
+         for violation_id, repeats in pending.items()],
+        ordered=False
+    )
+
+
+async def flush_violation_repeats_periodically():
+    """Flush repeat counts on a fixed interval and forget expired debounce windows"""
+    while True:
+        await asyncio.sleep(VIOLATION_FLUSH_INTERVAL_SECONDS)
+        try:
+            await flush_violation_repeats()
+        except Exception as e:
+            logger.error(f"Violation repeat flush error: {e}")
+        
+        cutoff = time.monotonic() - VIOLATION_DEBOUNCE_SECONDS
+        for key in [key for key, (_, seen) in _recent_violations.items() if seen < cutoff]:
+            del _recent_violations[key]
+
+
+def is_email_conflict(error: Dict) -> bool:
+    """Whether a duplicate-key error was raised by the unique students.email index"""
+    return 'email' in (error.get('keyPattern') or {}) or 'email_1' in str(error.get('errmsg', ''))
+
+
+def json_etag(body: bytes) -> str:
+    """
+    Weak ETag for a rendered JSON body
+    Weak because GZipMiddleware may send the same body gzip-encoded or not
+    """
+    return f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag"""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix('W/')
+    return any(
+        candidate == '*' or candidate.removeprefix('W/') == opaque
+        for candidate in (part.strip() for part in if_none_match.split(','))
+    )
+
+
+def polled_json_response(
+    request: Request, body: bytes, etag: str, cache_control: str = POLL_CACHE_CONTROL
+) -> Response:
+    """JSON response with cache headers; 304 when the client already has this body"""
+    headers = {"Cache-Control": cache_control, "ETag": etag}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def stream_json_array(cursor, defaults: Optional[Dict] = None) -> AsyncIterator[bytes]:
+    """
+    Encode documents from a Motor cursor as a JSON array, one element at a time
+    Fields missing from a document are filled from defaults, as the response model would
+    """
+    yield b"["
+    first = True
+    async for doc in cursor:
+        if not first:
+            yield b","
+        first = False
+        yield orjson.dumps({**defaults, **doc} if defaults else doc)
+    yield b"]"
 
 
 # ============================================================================
@@ -68,19 +271,23 @@ def generate_student_id() -> str:
 async def register_student(student_data: StudentCreate):
     """Register a new student for the exam"""
     try:
-        # Check if email already exists
-        existing = await db.students.find_one({"email": student_data.email})
-        if existing:
-            raise HTTPException(status_code=400, detail="Email already registered")
-        
-        # Create student with auto-generated ID
-        student = Student(
-            student_id=generate_student_id(),
-            name=student_data.name,
-            email=student_data.email
-        )
+        # Unique indexes on email and student_id make the insert itself the duplicate check
+        for _ in range(STUDENT_ID_ATTEMPTS):
+            student = Student(
+                student_id=generate_student_id(),
+                name=student_data.name,
+                email=student_data.email
+            )
+            try:
+                await db.students.insert_one(student.dict())
+                break
+            except DuplicateKeyError as e:
+                if is_email_conflict(e.details or {}):
+                    raise HTTPException(status_code=400, detail="Email already registered")
+                # student_id collision, retry with a fresh ID
+        else:
+            raise HTTPException(status_code=500, detail="Could not allocate a unique student ID")
         
-        await db.students.insert_one(student.dict())
         logger.info(f"Student registered: {student.student_id}")
         
         return StudentResponse(**student.dict())
@@ -91,6 +298,73 @@ async def register_student(student_data: StudentCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@api_router.post("/students/register_batch", response_model=StudentBatchResponse)
+async def register_students_batch(students_data: List[StudentCreate]):
+    """Register many students with one conflict query and one bulk insert"""
+    try:
+        emails = [s.email for s in students_data]
+        existing = await db.students.find(
+            {"email": {"$in": emails}}, {"email": 1, "_id": 0}
+        ).to_list(None)
+        taken_emails = {doc['email'] for doc in existing}
+        conflicting_emails = set(taken_emails)
+        
+        students = []
+        for student_data in students_data:
+            # Repeats of the same email within this batch are reported as conflicts too
+            if student_data.email in taken_emails:
+                conflicting_emails.add(student_data.email)
+                continue
+            taken_emails.add(student_data.email)
+            students.append(Student(
+                student_id=generate_student_id(),
+                name=student_data.name,
+                email=student_data.email
+            ))
+        
+        registered = []
+        pending = students
+        for _ in range(STUDENT_ID_ATTEMPTS):
+            if not pending:
+                break
+            try:
+                await db.students.insert_many([s.dict() for s in pending], ordered=False)
+                registered.extend(pending)
+                pending = []
+            except BulkWriteError as e:
+                # Rows rejected by the unique indexes: emails registered concurrently
+                # are conflicts, student_id collisions are retried with a fresh ID
+                errors = {err['index']: err for err in e.details.get('writeErrors', [])}
+                retry = []
+                for i, student in enumerate(pending):
+                    error = errors.get(i)
+                    if error is None:
+                        registered.append(student)
+                    elif error.get('code') != 11000:
+                        raise
+                    elif is_email_conflict(error):
+                        conflicting_emails.add(student.email)
+                    else:
+                        student.student_id = generate_student_id()
+                        retry.append(student)
+                pending = retry
+        if pending:
+            logger.error(f"Batch registration: no unique student ID for {[s.email for s in pending]}")
+            raise HTTPException(status_code=500, detail="Could not allocate a unique student ID")
+        
+        logger.info(f"Batch registration: {len(registered)} registered, {len(emails) - len(registered)} skipped")
+        
+        return StudentBatchResponse(
+            registered=[StudentResponse(**s.dict()) for s in registered],
+            duplicate_emails=[email for email in dict.fromkeys(emails) if email in conflicting_emails]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch registration error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @api_router.get("/students/{student_id}", response_model=StudentResponse)
 async def get_student(student_id: str):
     """Get student details by student_id"""
@@ -108,7 +382,9 @@ async def get_student(student_id: str):
 async def calibrate_student(request: CalibrationRequest):
     """Calibrate student's head pose for looking away detection"""
     try:
-        result = proctoring_service.calibrate_from_frame(request.frame_base64)
+        result = await asyncio.get_running_loop().run_in_executor(
+            frame_executor, proctoring_service.calibrate_from_frame, request.frame_base64
+        )
         
         if result:
             pitch, yaw = result
@@ -135,7 +411,9 @@ async def calibrate_student(request: CalibrationRequest):
 async def check_environment(request: EnvironmentCheckRequest):
     """Check if environment is suitable for exam (lighting, face detection)"""
     try:
-        result = proctoring_service.calibrate_from_frame(request.frame_base64)
+        result = await asyncio.get_running_loop().run_in_executor(
+            frame_executor, proctoring_service.calibrate_from_frame, request.frame_base64
+        )
         
         if result:
             return EnvironmentCheck(
@@ -177,6 +455,7 @@ async def start_exam_session(session_data: ExamSessionCreate):
         )
         
         await db.exam_sessions.insert_one(session.dict())
+        cache_session_identity(session.id, {"student_id": session.student_id, "student_name": session.student_name})
         logger.info(f"Exam session started: {session.id} for {session.student_name}")
         
         # Notify admins via WebSocket
@@ -207,23 +486,33 @@ async def get_session(session_id: str):
 async def end_exam_session(session_id: str):
     """End an exam session"""
     try:
-        session = await db.exam_sessions.find_one({"id": session_id})
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        await db.exam_sessions.update_one(
+        # The update itself tells us whether the session exists
+        end_time = datetime.utcnow()
+        update = await db.exam_sessions.update_one(
             {"id": session_id},
             {"$set": {
-                "end_time": datetime.utcnow(),
+                "end_time": end_time,
                 "status": "completed"
             }}
         )
+        if update.matched_count == 0:
+            raise HTTPException(status_code=404, detail="Session not found")
+        _session_cache.pop(session_id, None)
+        
+        # Close the session's debounce windows and persist their outstanding repeats;
+        # the session has ended either way, so a failed flush is only logged
+        session_keys = [key for key in _recent_violations if key[0] == session_id]
+        session_violation_ids = [_recent_violations.pop(key)[0] for key in session_keys]
+        try:
+            await flush_violation_repeats(session_violation_ids)
+        except Exception as e:
+            logger.error(f"Violation repeat flush error: {e}")
         
         # Notify admins
         await ws_manager.send_session_update({
             'session_id': session_id,
             'status': 'completed',
-            'end_time': datetime.utcnow().isoformat()
+            'end_time': end_time.isoformat()
         })
         
         return {"message": "Session ended successfully"}
@@ -235,100 +524,190 @@ async def end_exam_session(session_id: str):
 
 
 @api_router.get("/sessions/active/list", response_model=List[ExamSession])
-async def get_active_sessions():
+async def get_active_sessions(request: Request):
     """Get all active exam sessions"""
-    sessions = await db.exam_sessions.find({"status": "active"}).to_list(100)
-    return [ExamSession(**session) for session in sessions]
+    sessions = await db.exam_sessions.find({"status": "active"}, {"_id": 0}).to_list(100)
+    body = orjson.dumps([ExamSession.model_construct(**session).model_dump() for session in sessions])
+    return polled_json_response(request, body, json_etag(body), REVALIDATE_CACHE_CONTROL)
 
 
 # ============================================================================
 # PROCTORING - FRAME PROCESSING ENDPOINT
 # ============================================================================
 
-@api_router.post("/proctoring/process-frame", response_model=FrameProcessResponse)
-async def process_frame(request: FrameProcessRequest):
-    """Process a video frame for violations"""
+async def record_frame_result(session_id: str, result: Dict):
+    """Persist violations from a processed frame, update session counters and alert admins"""
+    session_inc = {"total_frames": 1}
+    violations = []
+    
+    # Repeats inside the debounce window only bump the stored record's occurrences.
+    # New windows open immediately with a pre-assigned record id, so frames for the
+    # same condition arriving while this one uploads and writes fold into it
+    now = time.monotonic()
+    fresh_details = []
+    for violation_detail in result['violations']:
+        key = (session_id, violation_detail['type'])
+        recent = _recent_violations.get(key)
+        if recent and now - recent[1] < VIOLATION_DEBOUNCE_SECONDS:
+            _pending_repeats[recent[0]] += 1
+        else:
+            violation_id = str(uuid.uuid4())
+            _recent_violations[key] = (violation_id, now)
+            _unwritten_violations.add(violation_id)
+            fresh_details.append((violation_detail, violation_id))
+    
     try:
-        # Process frame with AI
-        result = proctoring_service.process_frame(
-            request.frame_base64,
-            request.calibrated_pitch,
-            request.calibrated_yaw
-        )
-        
-        if 'error' in result:
-            raise HTTPException(status_code=400, detail=result['error'])
-        
-        # Update session frame count
-        await db.exam_sessions.update_one(
-            {"id": request.session_id},
-            {"$inc": {"total_frames": 1}}
-        )
-        
-        # If violations detected, save to database and Supabase
-        if result['violations']:
-            session = await db.exam_sessions.find_one({"id": request.session_id})
+        # If new violations detected, save to database and Supabase
+        if fresh_details:
+            session = await get_session_identity(session_id)
+            if not session:
+                raise HTTPException(status_code=404, detail="Session not found")
             
-            for violation_detail in result['violations']:
-                # Only upload snapshots for camera-based violations
-                # Browser events (copy_paste, tab_switch, excessive_noise) don't need snapshots
-                camera_based_violations = ['phone_detected', 'book_detected', 'multiple_faces', 
-                                          'no_person', 'looking_away']
-                
-                snapshot_url = None
-                snapshot_base64 = None
-                
-                if violation_detail['type'] in camera_based_violations and result.get('snapshot_base64'):
-                    logger.info(f"Uploading snapshot for violation: {violation_detail['type']}")
-                    snapshot_url = supabase_service.upload_violation_snapshot(
-                        result['snapshot_base64'],
-                        session['student_id'],
-                        request.session_id,
-                        violation_detail['type']
-                    )
-                    # Always keep base64 as fallback
-                    snapshot_base64 = result['snapshot_base64']
+            # All violations raised by one frame share its timestamp
+            frame_time = datetime.utcnow()
+            
+            # Only upload snapshots for camera-based violations
+            # Browser events (copy_paste, tab_switch, excessive_noise) don't need snapshots
+            snapshot_base64 = result.get('snapshot_base64')
+            needs_snapshot = snapshot_base64 and any(
+                v['type'] in CAMERA_BASED_VIOLATIONS for v, _ in fresh_details
+            )
+            
+            # Every violation in a frame shares the same image, so upload it once
+            frame_snapshot_url = None
+            if needs_snapshot:
+                frame_snapshot_url = await supabase_service.upload_violation_snapshot(
+                    snapshot_base64,
+                    session['student_id'],
+                    session_id
+                )
+            
+            for violation_detail, violation_id in fresh_details:
+                if needs_snapshot and violation_detail['type'] in CAMERA_BASED_VIOLATIONS:
+                    snapshot_url = frame_snapshot_url
                     if not snapshot_url:
                         logger.warning("Supabase upload failed, using base64 fallback for display")
                     else:
                         logger.info(f"✅ Snapshot uploaded successfully: {snapshot_url}")
+                    # Always keep base64 as fallback
+                    violation_snapshot_base64 = snapshot_base64
                 else:
                     logger.info(f"Skipping snapshot for browser/audio violation: {violation_detail['type']}")
+                    snapshot_url = None
+                    violation_snapshot_base64 = None
                 
                 # Create violation record
-                violation = Violation(
-                    session_id=request.session_id,
+                violations.append(Violation(
+                    id=violation_id,
+                    session_id=session_id,
                     student_id=session['student_id'],
                     student_name=session['student_name'],
+                    timestamp=frame_time,
                     violation_type=violation_detail['type'],
                     severity=violation_detail['severity'],
                     message=violation_detail['message'],
                     snapshot_url=snapshot_url,
-                    snapshot_base64=snapshot_base64,
+                    snapshot_base64=violation_snapshot_base64,
                     head_pose=result.get('head_pose')
-                )
-                
-                await db.violations.insert_one(violation.dict())
-                
-                # Update session violation count
-                await db.exam_sessions.update_one(
-                    {"id": request.session_id},
-                    {"$inc": {"violation_count": 1}}
-                )
-                
-                # Broadcast violation alert to admins via WebSocket
-                await ws_manager.broadcast_violation_alert({
-                    'session_id': request.session_id,
-                    'student_id': session['student_id'],
-                    'student_name': session['student_name'],
-                    'violation_type': violation_detail['type'],
-                    'severity': violation_detail['severity'],
-                    'message': violation_detail['message'],
-                    'snapshot_url': snapshot_url,
-                    'timestamp': violation.timestamp.isoformat()
-                })
-                
-                logger.info(f"Violation detected: {violation_detail['type']} - {session['student_name']}")
+                ))
+            
+            session_inc["violation_count"] = len(violations)
+        
+        # Violation inserts go out as one bulk write, alongside a single counter update
+        writes = [db.exam_sessions.update_one(
+            {"id": session_id},
+            {"$inc": session_inc}
+        )]
+        if violations:
+            writes.append(db.violations.bulk_write(
+                [InsertOne(v.dict()) for v in violations],
+                ordered=False
+            ))
+        await asyncio.gather(*writes)
+    except BaseException:
+        # Nothing was stored for these windows; close them so the next frame records afresh
+        for violation_detail, violation_id in fresh_details:
+            key = (session_id, violation_detail['type'])
+            if _recent_violations.get(key, (None,))[0] == violation_id:
+                del _recent_violations[key]
+            _pending_repeats.pop(violation_id, None)
+        raise
+    finally:
+        _unwritten_violations.difference_update(violation_id for _, violation_id in fresh_details)
+    
+    # Broadcast all of this frame's alerts to admins in one WebSocket message
+    alerts = []
+    frame_time_iso = violations[0].timestamp.isoformat() if violations else None
+    for violation in violations:
+        alerts.append({
+            'session_id': session_id,
+            'student_id': violation.student_id,
+            'student_name': violation.student_name,
+            'violation_type': violation.violation_type,
+            'severity': violation.severity,
+            'message': violation.message,
+            'snapshot_url': violation.snapshot_url,
+            'timestamp': frame_time_iso
+        })
+        
+        logger.info(f"Violation detected: {violation.violation_type} - {violation.student_name}")
+    
+    await ws_manager.broadcast_violation_alert_batch(alerts)
+
+
+@api_router.post("/proctoring/process-frame", response_model=FrameProcessResponse, deprecated=True)
+async def process_frame(request: FrameProcessRequest):
+    """
+    Process a base64-encoded video frame for violations
+    Deprecated: prefer /proctoring/process-frame/raw, which skips the base64 layer
+    """
+    try:
+        # Process frame with AI (decode + inference run off the event loop)
+        result = await asyncio.get_running_loop().run_in_executor(
+            frame_executor,
+            proctoring_service.process_frame,
+            request.frame_base64,
+            request.calibrated_pitch,
+            request.calibrated_yaw
+        )
+        
+        if 'error' in result:
+            raise HTTPException(status_code=400, detail=result['error'])
+        
+        await record_frame_result(request.session_id, result)
+        
+        return FrameProcessResponse(**result)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Frame processing error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@api_router.post("/proctoring/process-frame/raw", response_model=FrameProcessResponse)
+async def process_frame_raw(
+    session_id: str = Form(...),
+    calibrated_pitch: float = Form(...),
+    calibrated_yaw: float = Form(...),
+    frame: UploadFile = File(...)
+):
+    """Process a video frame uploaded as raw image bytes (multipart/form-data)"""
+    try:
+        frame_bytes = await frame.read()
+        
+        result = await asyncio.get_running_loop().run_in_executor(
+            frame_executor,
+            proctoring_service.process_frame_bytes,
+            frame_bytes,
+            calibrated_pitch,
+            calibrated_yaw
+        )
+        
+        if 'error' in result:
+            raise HTTPException(status_code=400, detail=result['error'])
+        
+        await record_frame_result(session_id, result)
         
         return FrameProcessResponse(**result)
         
@@ -343,7 +722,7 @@ async def process_frame(request: FrameProcessRequest):
 async def report_browser_violation(request: BrowserViolationRequest):
     """Report browser-based violations (copy/paste, tab switching)"""
     try:
-        session = await db.exam_sessions.find_one({"id": request.session_id})
+        session = await get_session_identity(request.session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
@@ -395,18 +774,18 @@ async def report_browser_violation(request: BrowserViolationRequest):
 # VIOLATION ENDPOINTS
 # ============================================================================
 
-@api_router.get("/violations/session/{session_id}", response_model=List[Violation])
+@api_router.get("/violations/session/{session_id}", response_class=StreamingResponse)
 async def get_session_violations(session_id: str):
     """Get all violations for a specific session"""
-    violations = await db.violations.find({"session_id": session_id}).to_list(1000)
-    return [Violation(**v) for v in violations]
+    cursor = db.violations.find({"session_id": session_id}, VIOLATION_LIST_PROJECTION).limit(1000)
+    return StreamingResponse(stream_json_array(cursor, VIOLATION_DEFAULTS), media_type="application/json")
 
 
-@api_router.get("/violations/student/{student_id}", response_model=List[Violation])
+@api_router.get("/violations/student/{student_id}", response_class=StreamingResponse)
 async def get_student_violations(student_id: str):
     """Get all violations for a specific student"""
-    violations = await db.violations.find({"student_id": student_id}).to_list(1000)
-    return [Violation(**v) for v in violations]
+    cursor = db.violations.find({"student_id": student_id}, VIOLATION_LIST_PROJECTION).limit(1000)
+    return StreamingResponse(stream_json_array(cursor, VIOLATION_DEFAULTS), media_type="application/json")
 
 
 @api_router.get("/admin/student/{student_id}/evidence")
@@ -467,8 +846,8 @@ async def get_violation_snapshot(violation_id: str):
 @api_router.get("/violations/recent", response_model=List[Violation])
 async def get_recent_violations(limit: int = 50):
     """Get recent violations across all sessions"""
-    violations = await db.violations.find().sort("timestamp", -1).limit(limit).to_list(limit)
-    return [Violation(**v) for v in violations]
+    violations = await db.violations.find({}, VIOLATION_LIST_PROJECTION).sort("timestamp", -1).limit(limit).to_list(limit)
+    return [Violation.model_construct(**v) for v in violations]
 
 
 # ============================================================================
@@ -476,20 +855,42 @@ async def get_recent_violations(limit: int = 50):
 # ============================================================================
 
 @api_router.get("/admin/stats", response_model=SessionStats)
-async def get_admin_stats():
+async def get_admin_stats(request: Request):
     """Get admin dashboard statistics"""
     try:
-        total_sessions = await db.exam_sessions.count_documents({})
-        active_sessions = await db.exam_sessions.count_documents({"status": "active"})
-        completed_sessions = await db.exam_sessions.count_documents({"status": "completed"})
-        total_violations = await db.violations.count_documents({})
+        # Dashboards poll this endpoint; serve bursts of polls from a short-lived cache
+        now = time.monotonic()
+        if _stats_cache['body'] is not None and now < _stats_cache['expires']:
+            return polled_json_response(request, _stats_cache['body'], _stats_cache['etag'])
+        
+        # All session counts in one aggregation, run alongside the violation count
+        pipeline = [{"$facet": {
+            "total": [{"$count": "n"}],
+            "active": [{"$match": {"status": "active"}}, {"$count": "n"}],
+            "completed": [{"$match": {"status": "completed"}}, {"$count": "n"}]
+        }}]
+        session_counts, total_violations = await asyncio.gather(
+            db.exam_sessions.aggregate(pipeline).to_list(1),
+            db.violations.count_documents({})
+        )
+        facets = session_counts[0] if session_counts else {}
         
-        return SessionStats(
-            total_sessions=total_sessions,
-            active_sessions=active_sessions,
-            completed_sessions=completed_sessions,
+        def facet_count(name: str) -> int:
+            rows = facets.get(name)
+            return rows[0]['n'] if rows else 0
+        
+        stats = SessionStats(
+            total_sessions=facet_count('total'),
+            active_sessions=facet_count('active'),
+            completed_sessions=facet_count('completed'),
             total_violations=total_violations
         )
+        
+        body = orjson.dumps(stats.model_dump())
+        _stats_cache['body'] = body
+        _stats_cache['etag'] = json_etag(body)
+        _stats_cache['expires'] = now + STATS_CACHE_TTL_SECONDS
+        return polled_json_response(request, body, _stats_cache['etag'])
     except Exception as e:
         logger.error(f"Get admin stats error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -580,33 +981,12 @@ async def get_students_with_violations():
         logger.error(f"Get students with violations error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-    raise HTTPException(status_code=401, detail="Invalid credentials")
-
-
-async def get_admin_stats():
-    """Get overall statistics for admin dashboard"""
-    try:
-        total_sessions = await db.exam_sessions.count_documents({})
-        active_sessions = await db.exam_sessions.count_documents({"status": "active"})
-        completed_sessions = await db.exam_sessions.count_documents({"status": "completed"})
-        total_violations = await db.violations.count_documents({})
-        
-        return SessionStats(
-            total_sessions=total_sessions,
-            active_sessions=active_sessions,
-            completed_sessions=completed_sessions,
-            total_violations=total_violations
-        )
-    except Exception as e:
-        logger.error(f"Stats error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
 
 @api_router.get("/admin/sessions/all", response_model=List[ExamSession])
 async def get_all_sessions():
     """Get all exam sessions"""
-    sessions = await db.exam_sessions.find().sort("start_time", -1).to_list(1000)
-    return [ExamSession(**session) for session in sessions]
+    sessions = await db.exam_sessions.find({}, {"_id": 0}).sort("start_time", -1).to_list(1000)
+    return [ExamSession.model_construct(**session) for session in sessions]
 
 
 
@@ -746,7 +1126,10 @@ async def export_student_violations_csv(student_id: str):
         
         violations = await db.violations.find({"student_id": student_id}).to_list(10000)
         
-        csv_content = export_service.export_student_violations_csv(
+        # Report generation is CPU-bound; keep it off the event loop
+        csv_content = await asyncio.get_running_loop().run_in_executor(
+            None,
+            export_service.export_student_violations_csv,
             student_id,
             student.get('name', 'Unknown'),
             violations
@@ -772,72 +1155,25 @@ async def export_student_report_html(student_id: str):
         if not student:
             raise HTTPException(status_code=404, detail="Student not found")
         
-        violations = await db.violations.find({"student_id": student_id}).sort("timestamp", -1).to_list(10000)
+        violations = await db.violations.find(
+            {"student_id": student_id}, STUDENT_REPORT_PROJECTION
+        ).sort("timestamp", -1).to_list(10000)
         
-        html_content = export_service.generate_student_html_report(
-            student_id,
-            student.get('name', 'Unknown'),
-            violations
+        # Sync iterators are consumed in Starlette's threadpool, so rendering stays off the event loop
+        return StreamingResponse(
+            export_service.iter_student_html_report(
+                student_id,
+                student.get('name', 'Unknown'),
+                violations
+            ),
+            media_type="text/html"
         )
-        
-        return HTMLResponse(content=html_content)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Export student HTML error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-        violations = await db.violations.find({"student_id": student_id}).to_list(10000)
-        total_violations = len(violations)
-        
-        # Calculate average violations per session
-        avg_violations_per_session = total_violations / total_sessions if total_sessions > 0 else 0
-        
-        # Calculate average session duration
-        total_duration_minutes = 0
-        for session in sessions:
-            if session.get('end_time') and session.get('start_time'):
-                duration = (session['end_time'] - session['start_time']).total_seconds() / 60
-                total_duration_minutes += duration
-        
-        avg_session_duration_minutes = total_duration_minutes / total_sessions if total_sessions > 0 else 0
-        
-        # Violation breakdown by type
-        violation_breakdown = {}
-        for v in violations:
-            v_type = v.get('violation_type', 'unknown')
-            violation_breakdown[v_type] = violation_breakdown.get(v_type, 0) + 1
-        
-        # Violations over time (grouped by hour)
-        violations_by_time = {}
-        for v in violations:
-            timestamp = v.get('timestamp')
-            if timestamp:
-                # Group by hour
-                hour_key = timestamp.replace(minute=0, second=0, microsecond=0)
-                violations_by_time[hour_key] = violations_by_time.get(hour_key, 0) + 1
-        
-        violations_over_time = [
-            ViolationTimePoint(timestamp=ts, count=count)
-            for ts, count in sorted(violations_by_time.items())
-        ]
-        
-        return StudentStatistics(
-            student_id=student_id,
-            student_name=student.get('name', 'Unknown'),
-            total_violations=total_violations,
-            avg_violations_per_session=round(avg_violations_per_session, 2),
-            total_sessions=total_sessions,
-            avg_session_duration_minutes=round(avg_session_duration_minutes, 2),
-            violation_breakdown=violation_breakdown,
-            violations_over_time=violations_over_time
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Student statistics error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
 
 @api_router.get("/admin/violations/timeline")
 async def get_violations_timeline(limit: int = 100):
@@ -889,16 +1225,19 @@ async def export_violations_csv(session_id: Optional[str] = None, student_id: Op
     """Export violations to CSV"""
     try:
         if session_id:
-            violations = await db.violations.find({"session_id": session_id}).to_list(10000)
+            query = {"session_id": session_id}
         elif student_id:
-            violations = await db.violations.find({"student_id": student_id}).to_list(10000)
+            query = {"student_id": student_id}
         else:
-            violations = await db.violations.find().to_list(10000)
+            query = {}
         
-        csv_content = export_service.export_violations_csv(violations)
+        # Stream rows straight from the cursor; only the exported fields are fetched
+        projection = {field: 1 for field in VIOLATION_CSV_FIELDS}
+        projection["_id"] = 0
+        cursor = db.violations.find(query, projection)
         
         return StreamingResponse(
-            iter([csv_content]),
+            export_service.aiter_violations_csv(cursor),
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename=violations_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"}
         )
@@ -911,11 +1250,20 @@ async def export_violations_csv(session_id: Optional[str] = None, student_id: Op
 async def export_summary_csv():
     """Export summary report to CSV"""
     try:
-        sessions = await db.exam_sessions.find().to_list(10000)
-        violations = await db.violations.find().to_list(10000)
-        students = await db.students.find().to_list(10000)
+        total_students, total_sessions, (violation_types, student_violations) = await asyncio.gather(
+            db.students.count_documents({}),
+            db.exam_sessions.count_documents({}),
+            aggregate_violation_counts()
+        )
         
-        csv_content = export_service.export_summary_csv(sessions, violations, students)
+        csv_content = await asyncio.get_running_loop().run_in_executor(
+            None,
+            export_service.export_summary_csv,
+            total_students,
+            total_sessions,
+            violation_types,
+            student_violations
+        )
         
         return StreamingResponse(
             iter([csv_content]),
@@ -931,31 +1279,72 @@ async def export_summary_csv():
 async def export_report_html():
     """Export summary report as HTML (can be printed to PDF)"""
     try:
-        sessions = await db.exam_sessions.find().to_list(10000)
-        violations = await db.violations.find().to_list(10000)
-        students = await db.students.find().to_list(10000)
-        
-        html_content = export_service.generate_html_report(sessions, violations, students)
+        total_students, total_sessions, (violation_types, student_violations) = await asyncio.gather(
+            db.students.count_documents({}),
+            db.exam_sessions.count_documents({}),
+            aggregate_violation_counts()
+        )
         
-        return HTMLResponse(content=html_content)
+        return StreamingResponse(
+            export_service.iter_html_report(
+                total_students, total_sessions, violation_types, student_violations
+            ),
+            media_type="text/html"
+        )
     except Exception as e:
         logger.error(f"Export HTML error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-    except WebSocketDisconnect:
-        ws_manager.disconnect_admin(websocket)
-
-
 @app.websocket("/ws/student/{session_id}")
 async def websocket_student(websocket: WebSocket, session_id: str):
-    """WebSocket endpoint for student exam session"""
+    """
+    WebSocket endpoint for student exam session
+    Binary messages are raw image frames (JPEG bytes); each one is answered with a
+    'frame_result' message, avoiding an HTTP request per frame
+    """
     await ws_manager.connect_student(session_id, websocket)
+    calibration = None
     try:
         while True:
-            data = await websocket.receive_text()
-            # Handle student messages if needed
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            frame_bytes = message.get("bytes")
+            if frame_bytes is None:
+                # Text messages are not used yet
+                continue
+            
+            try:
+                # Calibration is fixed for the session, so it is read once per connection
+                if calibration is None:
+                    session = await db.exam_sessions.find_one(
+                        {"id": session_id},
+                        {"calibrated_pitch": 1, "calibrated_yaw": 1, "_id": 0}
+                    )
+                    if not session:
+                        await websocket.send_text(encode_message({'type': 'frame_result', 'data': {'error': 'Session not found'}}))
+                        continue
+                    calibration = (session.get('calibrated_pitch', 0.0), session.get('calibrated_yaw', 0.0))
+                
+                result = await asyncio.get_running_loop().run_in_executor(
+                    frame_executor,
+                    proctoring_service.process_frame_bytes,
+                    frame_bytes,
+                    *calibration
+                )
+                
+                if 'error' not in result:
+                    await record_frame_result(session_id, result)
+            except Exception as e:
+                logger.error(f"WebSocket frame processing error: {e}")
+                result = {'error': str(e)}
+            
+            await websocket.send_text(encode_message({'type': 'frame_result', 'data': result}))
     except WebSocketDisconnect:
+        pass
+    finally:
         ws_manager.disconnect_student(session_id)
 
 
@@ -992,7 +1381,73 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON lists, exports and reports; their repeated field names shrink several-fold
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+
+@app.on_event("startup")
+async def create_indexes():
+    """Create the indexes that back lookups and uniqueness checks"""
+    indexes = [
+        (db.students, "email", {"unique": True}),
+        (db.students, "student_id", {"unique": True}),
+        (db.exam_sessions, "id", {"unique": True}),
+        (db.exam_sessions, "status", {}),
+        (db.exam_sessions, "student_id", {}),
+        (db.exam_sessions, [("start_time", -1)], {}),
+        (db.violations, "id", {"unique": True}),
+        (db.violations, "student_id", {}),
+        (db.violations, [("timestamp", -1)], {}),
+        # Per-session timelines; also serves plain session_id lookups
+        (db.violations, [("session_id", 1), ("timestamp", -1)], {}),
+    ]
+    results = await asyncio.gather(
+        *(collection.create_index(keys, **options) for collection, keys, options in indexes),
+        return_exceptions=True
+    )
+    # A failed index (e.g. existing duplicates) is logged; only the students unique
+    # indexes stop startup, since registration relies on them as its duplicate check
+    required_error = None
+    for (collection, keys, options), result in zip(indexes, results):
+        if isinstance(result, Exception):
+            logger.error(f"Index creation error on {collection.name} {keys}: {result}")
+            if collection.name == "students" and options.get("unique") and required_error is None:
+                required_error = result
+    if isinstance(required_error, OperationFailure) and required_error.code == 11000:
+        raise RuntimeError(
+            "Unique indexes on students could not be created; "
+            "remove duplicate emails/student IDs and restart"
+        ) from required_error
+    if required_error is not None:
+        raise required_error
+
+
+@app.on_event("startup")
+async def warm_up_proctoring_models():
+    """Load and exercise the detection models before the first exam frame arrives"""
+    started = time.monotonic()
+    try:
+        await asyncio.get_running_loop().run_in_executor(frame_executor, proctoring_service.warm_up)
+        logger.info(f"Proctoring models warmed up in {time.monotonic() - started:.2f}s")
+    except Exception as e:
+        logger.error(f"Proctoring warm-up error: {e}")
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    """Start the periodic flush of debounced violation repeats"""
+    global _repeat_flush_task
+    _repeat_flush_task = asyncio.create_task(flush_violation_repeats_periodically())
+
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if _repeat_flush_task:
+        _repeat_flush_task.cancel()
+    try:
+        await flush_violation_repeats()
+    except Exception as e:
+        logger.error(f"Violation repeat flush error: {e}")
     client.close()
+    await supabase_service.close()
+    frame_executor.shutdown(wait=False)
@@ -1,9 +1,14 @@
 from supabase import create_client, Client
+import httpx
 import os
 from typing import Optional
+from collections import OrderedDict
 import base64
+import hashlib
 from datetime import datetime
-import uuid
+
+# Recently uploaded snapshots remembered per service, keyed by (session_id, content hash)
+SNAPSHOT_CACHE_SIZE = 256
 
 class SupabaseService:
     """
@@ -20,6 +25,19 @@ class SupabaseService:
         self.client: Client = create_client(supabase_url, supabase_key)
         self.bucket_name = "vinay"  # Changed to user's bucket name
         
+        # Snapshot uploads go straight to the storage REST API over a shared
+        # keep-alive pool, so frames reuse TLS connections and never block the event loop
+        self.storage_url = f"{supabase_url.rstrip('/')}/storage/v1"
+        self.http = httpx.AsyncClient(
+            headers={
+                "Authorization": f"Bearer {supabase_key}",
+                "apikey": supabase_key
+            },
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=httpx.Timeout(10.0)
+        )
+        self._snapshot_urls: OrderedDict = OrderedDict()
+        
         # Initialize bucket if it doesn't exist
         self._init_bucket()
     
@@ -51,16 +69,15 @@ class SupabaseService:
             print(f"⚠️ Bucket initialization error: {e}")
             print("📝 Will use base64 storage fallback")
     
-    def upload_violation_snapshot(
+    async def upload_violation_snapshot(
         self, 
         snapshot_base64: str, 
         student_id: str, 
-        session_id: str,
-        violation_type: str
+        session_id: str
     ) -> Optional[str]:
         """
         Upload a violation snapshot to Supabase storage
-        Returns the public URL of the uploaded image
+        Returns the public URL of the uploaded image, reusing it for identical images
         """
         try:
             # Decode base64 image
@@ -70,28 +87,38 @@ class SupabaseService:
             
             image_data = base64.b64decode(snapshot_base64)
             
-            # Generate unique filename
-            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-            unique_id = str(uuid.uuid4())[:8]
-            filename = f"{student_id}/{session_id}/{violation_type}_{timestamp}_{unique_id}.jpg"
+            # Identical images share one object named after their content hash
+            digest = hashlib.blake2b(image_data, digest_size=16).hexdigest()
+            cache_key = (session_id, digest)
+            cached_url = self._snapshot_urls.get(cache_key)
+            if cached_url:
+                self._snapshot_urls.move_to_end(cache_key)
+                return cached_url
+            
+            filename = f"{student_id}/{session_id}/{digest}.jpg"
             
             print(f"📤 Attempting to upload snapshot: {filename}")
             print(f"📦 Image data size: {len(image_data)} bytes")
             
             # Upload to Supabase with upsert to overwrite if exists
-            response = self.client.storage.from_(self.bucket_name).upload(
-                filename,
-                image_data,
-                file_options={
-                    "content-type": "image/jpeg",
-                    "upsert": "true"
+            response = await self.http.post(
+                f"{self.storage_url}/object/{self.bucket_name}/{filename}",
+                content=image_data,
+                headers={
+                    "Content-Type": "image/jpeg",
+                    "x-upsert": "true"
                 }
             )
+            response.raise_for_status()
             
-            print(f"📤 Upload response: {response}")
+            print(f"📤 Upload response: {response.status_code}")
             
-            # Get public URL
-            public_url = self.client.storage.from_(self.bucket_name).get_public_url(filename)
+            # Public buckets serve objects from a predictable URL
+            public_url = f"{self.storage_url}/object/public/{self.bucket_name}/{filename}"
+            
+            self._snapshot_urls[cache_key] = public_url
+            if len(self._snapshot_urls) > SNAPSHOT_CACHE_SIZE:
+                self._snapshot_urls.popitem(last=False)
             
             print(f"✅ Uploaded snapshot successfully!")
             print(f"🔗 Public URL: {public_url}")
@@ -151,6 +178,12 @@ class SupabaseService:
         except Exception as e:
             print(f"List snapshots error: {e}")
             return []
+    
+    async def close(self):
+        """
+        Close the shared HTTP connection pool
+        """
+        await self.http.aclose()
 
 # Global instance
 supabase_service = SupabaseService()
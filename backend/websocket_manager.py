@@ -1,8 +1,18 @@
 from fastapi import WebSocket
 from typing import Dict, List, Set
-import json
+import asyncio
+import orjson
 from datetime import datetime
 
+# Messages buffered per admin before the oldest ones are dropped
+ADMIN_QUEUE_SIZE = 64
+
+def encode_message(message: dict) -> str:
+    """
+    Serialize a WebSocket message once with orjson; sent as text because clients JSON.parse it
+    """
+    return orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
 class WebSocketManager:
     """
     Manages WebSocket connections for real-time admin dashboard updates
@@ -10,7 +20,12 @@ class WebSocketManager:
     
     def __init__(self):
         # Store active admin connections
-        self.admin_connections: List[WebSocket] = []
+        self.admin_connections: Set[WebSocket] = set()
+        
+        # Per-admin outbound queues drained by a dedicated writer task, so a slow
+        # admin socket never stalls the frame requests that raise alerts
+        self.admin_queues: Dict[WebSocket, asyncio.Queue] = {}
+        self.admin_writers: Dict[WebSocket, asyncio.Task] = {}
         
         # Store student connections by session_id
         self.student_connections: Dict[str, WebSocket] = {}
@@ -23,11 +38,14 @@ class WebSocketManager:
         Connect an admin to receive real-time updates
         """
         await websocket.accept()
-        self.admin_connections.append(websocket)
+        self.admin_connections.add(websocket)
+        queue = asyncio.Queue(maxsize=ADMIN_QUEUE_SIZE)
+        self.admin_queues[websocket] = queue
+        self.admin_writers[websocket] = asyncio.create_task(self._admin_writer(websocket, queue))
         print(f"✅ Admin connected. Total admins: {len(self.admin_connections)}")
         
         # Send current active sessions count
-        await self.send_to_admin({
+        self.send_to_admin(websocket, {
             'type': 'connection_status',
             'data': {
                 'active_sessions': len(self.active_sessions),
@@ -39,10 +57,26 @@ class WebSocketManager:
         """
         Disconnect an admin
         """
-        if websocket in self.admin_connections:
-            self.admin_connections.remove(websocket)
+        self.admin_connections.discard(websocket)
+        self.admin_queues.pop(websocket, None)
+        writer = self.admin_writers.pop(websocket, None)
+        if writer and writer is not asyncio.current_task():
+            writer.cancel()
         print(f"❌ Admin disconnected. Remaining admins: {len(self.admin_connections)}")
     
+    async def _admin_writer(self, websocket: WebSocket, queue: asyncio.Queue):
+        """
+        Send queued messages to one admin until its socket fails
+        """
+        while True:
+            payload = await queue.get()
+            try:
+                await websocket.send_text(payload)
+            except Exception as e:
+                print(f"Error sending to admin: {e}")
+                self.disconnect_admin(websocket)
+                return
+    
     async def connect_student(self, session_id: str, websocket: WebSocket):
         """
         Connect a student for their exam session
@@ -74,29 +108,33 @@ class WebSocketManager:
         
         print(f"❌ Student disconnected. Session: {session_id}")
     
-    async def send_to_admin(self, message: dict):
+    def send_to_admin(self, websocket: WebSocket, message: dict):
+        """
+        Queue a message for a single admin (used internally)
+        """
+        queue = self.admin_queues.get(websocket)
+        if queue is not None:
+            self._enqueue(queue, encode_message(message))
+    
+    def _enqueue(self, queue: asyncio.Queue, payload: str):
         """
-        Send message to a single admin (used internally)
+        Queue a payload, dropping the oldest message so a lagging admin sees the latest alerts
         """
-        if self.admin_connections:
-            await self.admin_connections[0].send_json(message)
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(payload)
     
     async def broadcast_to_admins(self, message: dict):
         """
         Broadcast message to all connected admins
         """
-        dead_connections = []
+        if not self.admin_queues:
+            return
         
-        for connection in self.admin_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                print(f"Error sending to admin: {e}")
-                dead_connections.append(connection)
-        
-        # Clean up dead connections
-        for conn in dead_connections:
-            self.disconnect_admin(conn)
+        # Serialize once and hand the payload to every admin's writer without waiting on I/O
+        payload = encode_message(message)
+        for queue in self.admin_queues.values():
+            self._enqueue(queue, payload)
     
     async def send_to_student(self, session_id: str, message: dict):
         """
@@ -104,7 +142,7 @@ class WebSocketManager:
         """
         if session_id in self.student_connections:
             try:
-                await self.student_connections[session_id].send_json(message)
+                await self.student_connections[session_id].send_text(encode_message(message))
             except Exception as e:
                 print(f"Error sending to student {session_id}: {e}")
                 self.disconnect_student(session_id)
@@ -121,6 +159,24 @@ class WebSocketManager:
         await self.broadcast_to_admins(message)
         print(f"🚨 Violation alert broadcasted: {violation_data.get('violation_type')}")
     
+    async def broadcast_violation_alert_batch(self, alerts: List[dict]):
+        """
+        Broadcast all violation alerts raised by one frame as a single message
+        """
+        if not alerts:
+            return
+        if len(alerts) == 1:
+            await self.broadcast_violation_alert(alerts[0])
+            return
+        
+        message = {
+            'type': 'violation_alert_batch',
+            'data': {'violations': alerts},
+            'timestamp': datetime.utcnow().isoformat()
+        }
+        await self.broadcast_to_admins(message)
+        print(f"🚨 {len(alerts)} violation alerts broadcasted: {', '.join(a.get('violation_type', '') for a in alerts)}")
+    
     async def send_session_update(self, session_data: dict):
         """
         Send session status update to admins
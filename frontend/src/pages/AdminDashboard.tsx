@@ -96,6 +96,19 @@ const AdminDashboard = () => {
 
           // Refresh recent violations
           loadRecentViolations();
+        } else if (message.type === 'violation_alert_batch') {
+          // Several violations raised by the same frame
+          const alerts: ViolationAlert[] = message.data.violations;
+          setLiveAlerts(prev => [...alerts, ...prev].slice(0, 20)); // Keep last 20
+
+          alerts.forEach(alert => {
+            toast.error(`${alert.student_name}: ${alert.message}`, {
+              duration: 5000,
+            });
+          });
+
+          playAlertSound();
+          loadRecentViolations();
         } else if (message.type === 'session_update') {
           // Refresh active sessions
           loadActiveSessions();
@@ -5,8 +5,8 @@ import { Button } from "@/components/ui/button";
 import { Card, CardContent } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
 import { toast } from "sonner";
-import { api, ExamSession, createWebSocket } from "@/services/api";
-import { startWebcam, stopWebcam, captureFrame } from "@/utils/webcam";
+import { api, ExamSession, FrameProcessResult, createWebSocket } from "@/services/api";
+import { startWebcam, stopWebcam, captureFrameBlob } from "@/utils/webcam";
 
 const StudentExam = () => {
   const navigate = useNavigate();
@@ -23,6 +23,7 @@ const StudentExam = () => {
   const videoRef = useRef<HTMLVideoElement>(null);
   const monitoringInterval = useRef<NodeJS.Timeout | null>(null);
   const wsRef = useRef<WebSocket | null>(null);
+  const frameInFlight = useRef(false);
 
   useEffect(() => {
     // Load student and calibration data
@@ -245,6 +246,14 @@ const StudentExam = () => {
         const message = JSON.parse(event.data);
         if (message.type === 'violation_warning') {
           toast.warning(message.data.message, { duration: 5000 });
+        } else if (message.type === 'frame_result') {
+          // Answer to a binary frame sent over this socket
+          frameInFlight.current = false;
+          if (message.data.error) {
+            console.error('Frame processing error:', message.data.error);
+          } else {
+            applyFrameResult(message.data);
+          }
         }
       };
 
@@ -254,6 +263,7 @@ const StudentExam = () => {
 
       ws.onclose = () => {
         console.log('WebSocket disconnected');
+        frameInFlight.current = false;
       };
 
       wsRef.current = ws;
@@ -262,53 +272,70 @@ const StudentExam = () => {
     }
   };
 
+  const applyFrameResult = (result: FrameProcessResult) => {
+    // Update current violations
+    const activeViolations: string[] = [];
+    if (result.no_person) activeViolations.push('No Person');
+    if (result.looking_away) activeViolations.push('Looking Away');
+    if (result.multiple_faces) activeViolations.push('Multiple People');
+    if (result.phone_detected) activeViolations.push('Phone Detected');
+    if (result.book_detected) activeViolations.push('Book Detected');
+
+    setCurrentViolations(activeViolations);
+
+    // If new violations detected, add to warnings
+    if (result.violations.length > 0) {
+      const newWarnings = result.violations.map(v => ({
+        type: v.type,
+        message: v.message,
+        time: new Date().toLocaleTimeString()
+      }));
+      
+      setWarnings(prev => [...newWarnings, ...prev].slice(0, 10)); // Keep last 10
+      setViolationCount(prev => prev + result.violations.length);
+
+      // Show toast for high severity violations
+      result.violations.forEach(v => {
+        if (v.severity === 'high') {
+          toast.error(v.message, { duration: 4000 });
+        }
+      });
+    }
+  };
+
   const startMonitoring = (examSession: ExamSession) => {
     setIsMonitoring(true);
 
     // Process frame every 2 seconds
     monitoringInterval.current = setInterval(async () => {
       if (!videoRef.current || !examSession) return;
+      // Skip this tick while the previous frame is still being processed
+      if (frameInFlight.current) return;
 
       try {
-        const frameBase64 = captureFrame(videoRef.current);
-        
+        const frame = await captureFrameBlob(videoRef.current);
+
+        // Send raw frames over the open WebSocket; its frame_result reply is handled in onmessage
+        const ws = wsRef.current;
+        if (ws && ws.readyState === WebSocket.OPEN) {
+          frameInFlight.current = true;
+          ws.send(frame);
+          return;
+        }
+
+        // Fall back to an HTTP upload while the socket is unavailable
+        frameInFlight.current = true;
         const result = await api.processFrame(
           examSession.id,
-          frameBase64,
+          frame,
           calibrationData.pitch,
           calibrationData.yaw
         );
-
-        // Update current violations
-        const activeViolations: string[] = [];
-        if (result.no_person) activeViolations.push('No Person');
-        if (result.looking_away) activeViolations.push('Looking Away');
-        if (result.multiple_faces) activeViolations.push('Multiple People');
-        if (result.phone_detected) activeViolations.push('Phone Detected');
-        if (result.book_detected) activeViolations.push('Book Detected');
-
-        setCurrentViolations(activeViolations);
-
-        // If new violations detected, add to warnings
-        if (result.violations.length > 0) {
-          const newWarnings = result.violations.map(v => ({
-            type: v.type,
-            message: v.message,
-            time: new Date().toLocaleTimeString()
-          }));
-          
-          setWarnings(prev => [...newWarnings, ...prev].slice(0, 10)); // Keep last 10
-          setViolationCount(prev => prev + result.violations.length);
-
-          // Show toast for high severity violations
-          result.violations.forEach(v => {
-            if (v.severity === 'high') {
-              toast.error(v.message, { duration: 4000 });
-            }
-          });
-        }
+        frameInFlight.current = false;
+        applyFrameResult(result);
 
       } catch (error) {
+        frameInFlight.current = false;
         console.error('Frame processing error:', error);
       }
     }, 2000); // Process every 2 seconds
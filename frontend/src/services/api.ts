@@ -151,21 +151,22 @@ export const api = {
   },
 
   // Frame processing (main proctoring endpoint)
+  // Frames are uploaded as raw JPEG bytes, skipping the base64 layer
   processFrame: async (
     sessionId: string,
-    frameBase64: string,
+    frame: Blob,
     calibratedPitch: number,
     calibratedYaw: number
   ): Promise<FrameProcessResult> => {
-    const response = await fetch(`${API_URL}/api/proctoring/process-frame`, {
+    const formData = new FormData();
+    formData.append('session_id', sessionId);
+    formData.append('calibrated_pitch', String(calibratedPitch));
+    formData.append('calibrated_yaw', String(calibratedYaw));
+    formData.append('frame', frame, 'frame.jpg');
+
+    const response = await fetch(`${API_URL}/api/proctoring/process-frame/raw`, {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({
-        session_id: sessionId,
-        frame_base64: frameBase64,
-        calibrated_pitch: calibratedPitch,
-        calibrated_yaw: calibratedYaw,
-      }),
+      body: formData,
     });
     if (!response.ok) {
       const error = await response.json();
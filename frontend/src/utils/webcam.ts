@@ -29,7 +29,7 @@ export const stopWebcam = (stream: MediaStream | null): void => {
   }
 };
 
-export const captureFrame = (videoElement: HTMLVideoElement): string => {
+const drawFrame = (videoElement: HTMLVideoElement): HTMLCanvasElement => {
   const canvas = document.createElement('canvas');
   canvas.width = videoElement.videoWidth;
   canvas.height = videoElement.videoHeight;
@@ -38,9 +38,25 @@ export const captureFrame = (videoElement: HTMLVideoElement): string => {
   if (!ctx) throw new Error('Failed to get canvas context');
 
   ctx.drawImage(videoElement, 0, 0);
+  return canvas;
+};
 
+export const captureFrame = (videoElement: HTMLVideoElement): string => {
   // Return base64 encoded image
-  return canvas.toDataURL('image/jpeg', 0.8);
+  return drawFrame(videoElement).toDataURL('image/jpeg', 0.8);
+};
+
+export const captureFrameBlob = (videoElement: HTMLVideoElement): Promise<Blob> => {
+  const canvas = drawFrame(videoElement);
+
+  // Return raw JPEG bytes for binary uploads
+  return new Promise((resolve, reject) => {
+    canvas.toBlob(
+      (blob) => (blob ? resolve(blob) : reject(new Error('Failed to encode frame'))),
+      'image/jpeg',
+      0.8
+    );
+  });
 };
 
 export const checkCameraPermissions = async (): Promise<boolean> => {